@@ -0,0 +1,101 @@
+"""Benchmark ukuran payload dan latency untuk projection / summary mode / kompresi.
+
+Request dikirim lewat TestClient(app), jadi yang diukur adalah jalur endpoint
+sebenarnya: validasi QuestionnaireAnalysis, penyimpanan ke evaluation store,
+serialisasi response dan CompressionMiddleware. Analyzer di-monkeypatch dengan
+scoring ESG offline supaya tidak butuh API key maupun panggilan Gemini.
+
+Usage:
+    python -m benchmarks.bench_response_payload
+    python -m benchmarks.bench_response_payload --questions 50 300 1000 --repeat 50
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlencode
+
+# Evaluation store benchmark ditaruh di direktori sementara, bukan di cwd
+os.environ.setdefault("EVALUATION_DB_PATH", os.path.join(tempfile.mkdtemp(), "evaluations.db"))
+
+from fastapi.testclient import TestClient
+
+import src.main as main
+from src.service import compression
+from src.service.scoring import calculate_esg_score
+
+VARIANTS = [
+    ("detail", {}),
+    ("summary", {"mode": "summary"}),
+    ("fields=score", {"fields": "score"}),
+    ("fields=score,final_score_percentage", {"fields": "score,score_details.final_score_percentage"}),
+]
+
+
+async def offline_analyze(questionnaire_answers, supporting_file_content=None,
+                          supporting_file_name=None, include_analysis=True):
+    result = calculate_esg_score(json.loads(questionnaire_answers), include_analysis)
+    return {**result, "score_format": "esg"}
+
+
+def build_questionnaire(num_questions: int) -> str:
+    # Jawaban A-E bergantian -> skor 50 untuk kelipatan 5 (lolos validasi score int)
+    return json.dumps({
+        "questions": [
+            {
+                "id": f"q{i + 1}",
+                "question": f"Question {i + 1}: mine closure, FPIC and supplier ESG compliance practices",
+                "max_points": 10,
+                "answer": "ABCDE"[i % 5],
+                "evidence": "Documented policy and annual audit report",
+            }
+            for i in range(num_questions)
+        ]
+    })
+
+
+def measure(client: TestClient, questionnaire: str, params: dict, encoding: str, repeat: int):
+    """Return (wire bytes, rata-rata latency ms) untuk satu kombinasi request."""
+    headers = {"Accept-Encoding": encoding, "Content-Type": "application/x-www-form-urlencoded"}
+    # Form body di-encode sekali di sini; kalau lewat data= httpx meng-urlencode
+    # ulang setiap request dan waktu client itu ikut terhitung sebagai latency
+    body = urlencode({"questionnaire_answers": questionnaire}).encode("ascii")
+    client.post("/analyze-mining-questionnaire", params=params, content=body, headers=headers)  # warm-up
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        resp = client.post("/analyze-mining-questionnaire", params=params, content=body, headers=headers)
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+    resp.raise_for_status()
+    return int(resp.headers["content-length"]), elapsed_ms
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark response projection & compression")
+    parser.add_argument("--questions", type=int, nargs="+", default=[50, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    main.analyze_mining_questionnaire = offline_analyze
+    client = TestClient(main.app)
+
+    encodings = ["identity", "gzip"] + (["br"] if compression.brotli is not None else [])
+    header = f"{'questions':>9} {'variant':<38}"
+    for encoding in encodings:
+        header += f" {encoding + ' B':>11} {encoding + ' ms':>12}"
+    print(header)
+    print("-" * len(header))
+
+    for num_questions in args.questions:
+        questionnaire = build_questionnaire(num_questions)
+        for label, params in VARIANTS:
+            line = f"{num_questions:>9} {label:<38}"
+            for encoding in encodings:
+                size, latency = measure(client, questionnaire, params, encoding, args.repeat)
+                line += f" {size:>11} {latency:>12.3f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main_cli()
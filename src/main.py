@@ -1,11 +1,31 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form
+import os
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 from .service.api_gemini import analyze_mining_questionnaire
+from .service.compression import CompressionMiddleware
+from .service.evaluation_store import EvaluationStore
+from .service.projection import RESPONSE_MODES, build_exclude, build_include, needs_analysis, parse_fields
 
 app = FastAPI(title="AIEngine RAIMES", description="Mining Evaluation System API")
 
+# Kompresi brotli/gzip sesuai Accept-Encoding untuk response besar
+app.add_middleware(CompressionMiddleware, minimum_size=1000)
+
+# Riwayat evaluasi + aggregate portfolio (persist di SQLite lokal)
+_evaluation_store: Optional[EvaluationStore] = None
+
+
+def get_evaluation_store() -> EvaluationStore:
+    """Buka store saat pertama dipakai (bukan saat import) di EVALUATION_DB_PATH."""
+    global _evaluation_store
+    if _evaluation_store is None:
+        _evaluation_store = EvaluationStore(os.getenv("EVALUATION_DB_PATH", "evaluations.db"))
+    return _evaluation_store
+
 class Review(BaseModel):
     id: int
     author: str
@@ -23,6 +43,7 @@ class QuestionnaireAnalysis(BaseModel):
     score: int = Field(..., ge=1, le=100)
     evaluation_date: datetime
     score_details: Optional[Dict] = None
+    evaluation_id: Optional[int] = None
 
 @app.get("/health")
 def health() -> Dict[str, str]:
@@ -40,17 +61,28 @@ def read_item(item_id: int):
 @app.post("/analyze-mining-questionnaire", response_model=QuestionnaireAnalysis)
 async def analyze_questionnaire(
     questionnaire_answers: str = Form(..., description="String jawaban kuisioner mining evaluation (bisa plain text atau JSON)"),
-    supporting_file: Optional[UploadFile] = File(None, description="File pendukung (PDF, DOC, TXT, dll)")
+    supporting_file: Optional[UploadFile] = File(None, description="File pendukung (PDF, DOC, TXT, dll)"),
+    fields: Optional[str] = Query(None, description="Field projection, misal score,score_details.final_score_percentage"),
+    mode: str = Query("detail", description="detail (lengkap) atau summary (tanpa analysis & question_details)")
 ):
     """Analisis jawaban kuisioner mining evaluation system menggunakan Gemini AI.
     
     Parameters:
     - questionnaire_answers: String jawaban kuisioner (bisa plain text atau JSON format)
     - supporting_file: File pendukung optional untuk analisis tambahan
+    - fields: (query) hanya kembalikan field ini, dot notation untuk nested field
+    - mode: (query) detail atau summary; fields diterapkan setelah mode
     
     Returns:
     - Hasil analisis dengan skor 1-100
     """
+    if mode not in RESPONSE_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode '{mode}'. Allowed: {', '.join(RESPONSE_MODES)}")
+    try:
+        field_paths = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         # Baca file pendukung jika ada
         file_content = None
@@ -63,15 +95,40 @@ async def analyze_questionnaire(
         result = await analyze_mining_questionnaire(
             questionnaire_answers=questionnaire_answers,
             supporting_file_content=file_content,
-            supporting_file_name=file_name
+            supporting_file_name=file_name,
+            include_analysis=needs_analysis(field_paths, mode)
         )
         
-        return QuestionnaireAnalysis(
+        # Validasi response dulu; evaluasi yang gagal divalidasi tidak masuk riwayat
+        response = QuestionnaireAnalysis(
             analysis=result["analysis"],
             score=result["score"],
             evaluation_date=datetime.utcnow(),
             score_details=result.get("score_details", None)
         )
+
+        # Simpan ke riwayat evaluasi; kegagalan penyimpanan tidak menggagalkan analisis
+        try:
+            response.evaluation_id = await run_in_threadpool(
+                get_evaluation_store().record,
+                score=response.score,
+                score_details=response.score_details,
+                evaluated_at=response.evaluation_date,
+                score_format=result.get("score_format")
+            )
+        except Exception as store_error:
+            print(f"[DEBUG] Failed to persist evaluation: {str(store_error)}")
+
+        if mode == "detail" and field_paths is None:
+            return response
+
+        # Projection/summary: serialize hanya bagian yang diminta dari response yang sudah divalidasi
+        payload = response.model_dump(
+            mode="json",
+            include=build_include(field_paths),
+            exclude=build_exclude(mode)
+        )
+        return JSONResponse(content=payload)
         
     except Exception as e:
         raise HTTPException(
@@ -79,6 +136,55 @@ async def analyze_questionnaire(
             detail=f"Error dalam analisis kuisioner: {str(e)}"
         )
 
+@app.get("/evaluations/aggregates/questions")
+def evaluation_question_aggregates(
+    period: Optional[str] = None,
+    score_format: Optional[str] = Query(None, alias="format", description="esg, weighted atau freeform")
+):
+    """Rata-rata skor dan distribusi jawaban per pertanyaan (opsional per kuartal, misal 2026-Q4)."""
+    return {
+        "period": period,
+        "format": score_format,
+        "questions": get_evaluation_store().question_summary(period, score_format)
+    }
+
+
+@app.get("/evaluations/aggregates/scores")
+def evaluation_score_aggregates(
+    period: Optional[str] = None,
+    score_format: Optional[str] = Query(None, alias="format", description="esg, weighted atau freeform")
+):
+    """Jumlah evaluasi, rata-rata dan percentile skor."""
+    return {"period": period, "format": score_format, **get_evaluation_store().score_summary(period, score_format)}
+
+
+@app.get("/evaluations/aggregates/risks")
+def evaluation_risk_aggregates(
+    period: Optional[str] = None,
+    score_format: Optional[str] = Query(None, alias="format", description="esg, weighted atau freeform")
+):
+    """Frekuensi jawaban berisiko (< 50%) dan contradiction risk per pertanyaan."""
+    return {
+        "period": period,
+        "format": score_format,
+        "risks": get_evaluation_store().risk_summary(period, score_format)
+    }
+
+
+@app.get("/evaluations/periods")
+def evaluation_periods() -> Dict[str, List[str]]:
+    """Daftar kuartal yang punya data evaluasi."""
+    return {"periods": get_evaluation_store().periods()}
+
+
+@app.get("/evaluations/{evaluation_id}")
+def read_evaluation(evaluation_id: int):
+    """Ambil satu evaluasi tersimpan beserta score_details-nya."""
+    evaluation = get_evaluation_store().get_evaluation(evaluation_id)
+    if evaluation is None:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    return evaluation
+
 # Simple in-memory store for reviews (resets on process restart)
 _reviews: List[Review] = []
 _next_id = 1
@@ -1,9 +1,12 @@
 ﻿import os
+import sys
 import json
 from typing import Dict, List, Optional
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+from .scoring import calculate_esg_score, calculate_weighted_score, detect_format
+
 load_dotenv()
 
 class GeminiAnalyzer:
@@ -36,16 +39,19 @@ class GeminiAnalyzer:
             print(f"Gemini API Error: {str(e)}")
             return self._generate_fallback_response(prompt)
 
-    async def analyze_mining_evaluation(self, questionnaire_answers: str, file_content: Optional[bytes] = None, file_name: Optional[str] = None) -> Dict:
+    async def analyze_mining_evaluation(self, questionnaire_answers: str, file_content: Optional[bytes] = None, file_name: Optional[str] = None, include_analysis: bool = True) -> Dict:
         """Analisis jawaban kuisioner mining evaluation system menggunakan Gemini AI dengan fallback.
         
         Args:
             questionnaire_answers: String berisi jawaban kuisioner (bisa plain text atau JSON)
             file_content: Konten file pendukung dalam bytes
             file_name: Nama file pendukung
+            include_analysis: False jika client tidak butuh narasi analysis (ESG format
+                melewati pembuatan narasi)
             
         Returns:
-            Dict berisi analysis, score, dan detail scoring.
+            Dict berisi analysis, score, detail scoring, dan score_format
+            ("esg" / "weighted", None jika tidak ada scoring deterministik).
         """
         try:
             # Parse jawaban kuisioner - coba JSON dulu, kalau gagal treat sebagai string biasa
@@ -60,18 +66,15 @@ class GeminiAnalyzer:
                 is_json = False
             
             # Check if this is ESG scoring format (has 'questions' with 'answer' field)
-            is_esg_format = False
-            if is_json and isinstance(answers, dict):
-                questions = answers.get('questions', [])
-                if questions and all(isinstance(q, dict) and 'answer' in q for q in questions):
-                    is_esg_format = True
+            score_format = detect_format(answers) if is_json else None
+            is_esg_format = score_format == "esg"
             
             # Calculate score based on format
             calculated_score = None
             if is_esg_format:
                 print(f"[DEBUG] Detected ESG scoring format")
-                calculated_score = self._calculate_esg_score(answers)
-            elif is_json and isinstance(answers, dict):
+                calculated_score = self._calculate_esg_score(answers, include_analysis)
+            elif score_format == "weighted":
                 print(f"[DEBUG] Using weighted scoring format")
                 calculated_score = self._calculate_weighted_score(answers)
             
@@ -83,7 +86,7 @@ class GeminiAnalyzer:
             # Jika ESG format dan sudah ada scoring, langsung return
             if is_esg_format and calculated_score:
                 print(f"[DEBUG] Returning ESG score: {calculated_score['score']}")
-                return calculated_score
+                return {**calculated_score, "score_format": "esg"}
             
             # Buat prompt untuk analisis Gemini (untuk non-ESG format)
             prompt = self._create_analysis_prompt(answers, is_json)
@@ -105,6 +108,7 @@ class GeminiAnalyzer:
                 if calculated_score is not None:
                     result['score'] = calculated_score['score']
                     result['score_details'] = calculated_score.get('score_details')
+                result['score_format'] = score_format if calculated_score is not None else None
                 
                 return result
                 
@@ -118,6 +122,7 @@ class GeminiAnalyzer:
                 if calculated_score is not None:
                     result['score'] = calculated_score['score']
                     result['score_details'] = calculated_score.get('score_details')
+                result['score_format'] = score_format if calculated_score is not None else None
                 
                 return result
             
@@ -217,249 +222,13 @@ Ensure the analysis is objective, constructive, and provides useful insights for
         final_score = base_score + coverage_bonus + completeness_bonus + quality_bonus
         return max(60, min(95, final_score))
     
-    def _calculate_esg_score(self, answers: Dict) -> Dict:
-        """
-        ESG Scoring dengan strict rules:
-        - Answer A=0%, B=25%, C=50%, D=75%, E=100%
-        - earned_points = max_points × percentage
-        - JANGAN reduce score ke 0 kecuali jawaban A atau bukti 100% kontradiksi
-        - final_score = (sum earned_points / total max_points) × 100
-        
-        Input format:
-        {
-            "questions": [
-                {
-                    "id": "q1",
-                    "question": "Mine closure planning...",
-                    "max_points": 20,
-                    "answer": "D",  # A, B, C, D, or E
-                    "evidence": "Optional evidence text"
-                },
-                ...
-            ]
-        }
-        
-        Returns:
-            Dict with Analysis and Score
-        """
-        try:
-            questions = answers.get('questions', [])
-            
-            if not questions:
-                return None
-            
-            # Answer percentage mapping
-            answer_mapping = {
-                'A': 0,
-                'B': 0.25,
-                'C': 0.50,
-                'D': 0.75,
-                'E': 1.00
-            }
-            
-            question_details = []
-            total_earned_points = 0
-            total_max_points = 0
-            analysis_parts = []
-            
-            strengths = []
-            risks = []
-            
-            for idx, question in enumerate(questions):
-                try:
-                    q_id = question.get('id', f'q{idx+1}')
-                    q_text = question.get('question', '')
-                    max_points = float(question.get('max_points', 100))
-                    answer = str(question.get('answer', 'A')).upper()
-                    evidence = question.get('evidence', '')
-                    
-                    # Validate answer
-                    if answer not in answer_mapping:
-                        print(f"[DEBUG] Invalid answer '{answer}' for {q_id}, defaulting to A")
-                        answer = 'A'
-                    
-                    percentage = answer_mapping[answer]
-                    earned_points = max_points * percentage
-                    
-                    # Check for contradiction (strict rule: only reduce if evidence 100% contradicts)
-                    final_earned_points = earned_points
-                    contradiction_found = False
-                    
-                    if evidence:
-                        contradiction_keywords = ['not implemented', 'no evidence', 'absent', 'none', 'not found', 'tidak ada']
-                        if any(keyword.lower() in evidence.lower() for keyword in contradiction_keywords):
-                            if answer not in ['A']:  # Only override if answer suggests some level
-                                print(f"[DEBUG] Potential contradiction found in {q_id}, but keeping score as evidence may be incomplete")
-                                contradiction_found = True
-                    
-                    total_earned_points += final_earned_points
-                    total_max_points += max_points
-                    
-                    # Categorize for analysis
-                    if percentage >= 0.75:
-                        strengths.append(f"• {q_id}: {q_text[:60]}... ({answer} - {percentage*100:.0f}%)")
-                    elif percentage < 0.50:
-                        risk_note = " [Evidence contradiction noted]" if contradiction_found else ""
-                        risks.append(f"• {q_id}: {q_text[:60]}... ({answer} - {percentage*100:.0f}%){risk_note}")
-                    
-                    question_details.append({
-                        'id': q_id,
-                        'answer': answer,
-                        'percentage': percentage,
-                        'max_points': max_points,
-                        'earned_points': final_earned_points,
-                        'contradiction_risk': contradiction_found
-                    })
-                    
-                except (ValueError, TypeError) as e:
-                    print(f"[DEBUG] Error parsing question {idx+1}: {str(e)}")
-                    continue
-            
-            # Calculate final score
-            if total_max_points > 0:
-                final_score = (total_earned_points / total_max_points) * 100
-            else:
-                final_score = 0
-            
-            # Build analysis narrative
-            analysis_text = f"""ESG SUSTAINABILITY EVALUATION - RAIMES MINING QUESTIONNAIRE
-
-SCORING METHODOLOGY:
-- Percentage values: A=0%, B=25%, C=50%, D=75%, E=100%
-- Earned points = Max points × Percentage
-- Final score = (Total earned points / Total max points) × 100
-
-ASSESSMENT SUMMARY:
-Total Questions: {len(question_details)}
-Total Points Available: {total_max_points}
-Total Points Earned: {round(total_earned_points, 2)}
-Final Score: {round(final_score, 2)}%
-
-"""
-            
-            if strengths:
-                analysis_text += f"STRENGTHS (D–E Rating):\n" + "\n".join(strengths) + "\n\n"
-            
-            if risks:
-                analysis_text += f"AREAS FOR IMPROVEMENT (≤C Rating):\n" + "\n".join(risks) + "\n\n"
-            
-            analysis_text += """KEY FOCUS AREAS FOR MINING SUSTAINABILITY:
-• Mine Closure & Restoration Planning
-• Free Prior Informed Consent (FPIC) with Indigenous Communities
-• ESG Supplier Compliance & Chain of Custody
-• Long-term Environmental & Social Sustainability
-• Transparent Governance & Stakeholder Engagement
-"""
-            
-            return {
-                "analysis": analysis_text,
-                "score": round(final_score, 2),
-                "score_details": {
-                    "total_questions": len(question_details),
-                    "total_max_points": total_max_points,
-                    "total_earned_points": round(total_earned_points, 2),
-                    "final_score_percentage": round(final_score, 2),
-                    "question_details": question_details
-                }
-            }
-            
-        except Exception as e:
-            print(f"[DEBUG] Error in _calculate_esg_score: {str(e)}")
-            return None
+    def _calculate_esg_score(self, answers: Dict, include_analysis: bool = True) -> Dict:
+        """ESG scoring (A=0%..E=100%), lihat scoring.calculate_esg_score."""
+        return calculate_esg_score(answers, include_analysis)
 
     def _calculate_weighted_score(self, answers: Dict) -> Dict:
-        """
-        Hitung score berdasarkan weighted system:
-        Score setiap soal = max_score * weight_percentage
-        Total max score = 10000
-        Final score = (total_weighted_score / 10000) * 100
-        
-        Struktur input yang diharapkan:
-        {
-            "questions": [
-                {
-                    "id": "q1",
-                    "max_score": 100,
-                    "weight": 0.75,  # atau "75%" atau 75
-                    "answer": "yes"
-                },
-                ...
-            ]
-        }
-        
-        Returns:
-            Dict dengan detail scoring breakdown
-        """
-        try:
-            questions = answers.get('questions', [])
-            
-            if not questions:
-                # Jika tidak ada struktur questions, return None
-                return None
-            
-            question_scores = []
-            total_weighted_score = 0
-            total_max_possible = 0
-            
-            for idx, question in enumerate(questions):
-                try:
-                    # Parse max_score
-                    max_score = float(question.get('max_score', 100))
-                    
-                    # Parse weight - bisa dalam format 0.75, "75%", atau 75
-                    weight_raw = question.get('weight', 1.0)
-                    if isinstance(weight_raw, str):
-                        if '%' in weight_raw:
-                            weight = float(weight_raw.replace('%', '')) / 100
-                        else:
-                            weight = float(weight_raw) / 100 if float(weight_raw) > 1 else float(weight_raw)
-                    else:
-                        weight = float(weight_raw) / 100 if weight_raw > 1 else float(weight_raw)
-                    
-                    # Ensure weight is between 0 and 1
-                    weight = max(0, min(1, weight))
-                    
-                    # Hitung score untuk soal ini
-                    question_score = max_score * weight
-                    total_weighted_score += question_score
-                    total_max_possible += max_score
-                    
-                    question_scores.append({
-                        "question_id": question.get('id', f'q{idx+1}'),
-                        "max_score": max_score,
-                        "weight": weight,
-                        "weight_percentage": f"{weight * 100:.1f}%",
-                        "score_obtained": question_score,
-                        "answer": question.get('answer', '')
-                    })
-                    
-                except (ValueError, TypeError) as e:
-                    print(f"[DEBUG] Error parsing question {idx+1}: {str(e)}")
-                    continue
-            
-            # Hitung final score
-            # Total max score jika 100% adalah 10000
-            # Jadi final score = (total_weighted_score / total_max_possible) * 10000 / 100
-            if total_max_possible > 0:
-                percentage = (total_weighted_score / total_max_possible) * 100
-            else:
-                percentage = 0
-            
-            final_score = int((total_weighted_score / total_max_possible * 100)) if total_max_possible > 0 else 0
-            
-            return {
-                "total_questions": len(question_scores),
-                "total_weighted_score": round(total_weighted_score, 2),
-                "total_max_possible": round(total_max_possible, 2),
-                "percentage": round(percentage, 2),
-                "final_score": min(100, max(0, final_score)),  # Clamp between 0-100
-                "question_details": question_scores,
-                "scoring_method": "Weighted scoring: each question score = max_score × weight"
-            }
-            
-        except Exception as e:
-            print(f"[DEBUG] Error in _calculate_weighted_score: {str(e)}")
-            return None
+        """Weighted scoring (max_score × weight), lihat scoring.calculate_weighted_score."""
+        return calculate_weighted_score(answers)
     
     def _flatten_dict(self, d: Dict, parent_key: str = '', sep: str = '_') -> Dict:
         """Flatten nested dictionary."""
@@ -538,19 +307,31 @@ Note: This analysis was generated using fallback system due to API limitations.
                 "score": 70
             }
 
-analyzer = GeminiAnalyzer()
+_analyzer: Optional[GeminiAnalyzer] = None
+
+def get_analyzer() -> GeminiAnalyzer:
+    """Buat GeminiAnalyzer saat pertama kali dibutuhkan.
 
-async def analyze_mining_questionnaire(questionnaire_answers: str, supporting_file_content: Optional[bytes] = None, supporting_file_name: Optional[str] = None) -> Dict:
-    return await analyzer.analyze_mining_evaluation(
+    Tidak dibuat saat import supaya path tanpa LLM (misal subcommand `score`
+    dan worker process-nya) tidak butuh API_GEMINI.
+    """
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = GeminiAnalyzer()
+    return _analyzer
+
+async def analyze_mining_questionnaire(questionnaire_answers: str, supporting_file_content: Optional[bytes] = None, supporting_file_name: Optional[str] = None, include_analysis: bool = True) -> Dict:
+    return await get_analyzer().analyze_mining_evaluation(
         questionnaire_answers=questionnaire_answers,
         file_content=supporting_file_content,
-        file_name=supporting_file_name
+        file_name=supporting_file_name,
+        include_analysis=include_analysis
     )
 
 # Legacy functions untuk backward compatibility
 def ask(prompt: str, model_name: str = "gemini-2.5-flash") -> str:
     """Legacy ask function untuk backward compatibility."""
-    return analyzer.ask(prompt, model_name)
+    return get_analyzer().ask(prompt, model_name)
 
 def main():
         import argparse
@@ -558,6 +339,15 @@ def main():
         parser = argparse.ArgumentParser(description="Gemini CLI — ask the model a question")
         parser.add_argument("-p", "--prompt", help="One-shot prompt to send and exit")
         parser.add_argument("-m", "--model", default="gemini-2.5-flash", help="Model name to use")
+        subparsers = parser.add_subparsers(dest="command")
+        subparsers.add_parser("score", add_help=False, help="Offline bulk scoring of archived questionnaires (no Gemini call), see: score --help")
+
+        # Semua argumen setelah `score` diteruskan ke CLI bulk_scoring. Import di sini
+        # supaya server API tidak ikut memuat CLI multiprocessing.
+        if sys.argv[1:2] == ["score"]:
+            from . import bulk_scoring
+            return bulk_scoring.main(sys.argv[2:], prog="python -m src.service.api_gemini score")
+
         args = parser.parse_args()
 
         if args.prompt:
@@ -589,3 +379,7 @@ def main():
                     print("Error calling Gemini:", e)
         except KeyboardInterrupt:
             print("\nExiting.")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
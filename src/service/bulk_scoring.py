@@ -0,0 +1,264 @@
+"""Offline bulk scoring untuk arsip kuisioner ESG / weighted.
+
+Membaca file JSON/JSONL (atau direktori berisi file tersebut), menghitung skor
+dengan logic di scoring.py memakai process pool, lalu menulis hasil secara
+incremental ke JSONL atau CSV. Tidak butuh HTTP server maupun panggilan Gemini.
+
+Usage:
+    python -m src.service.bulk_scoring archive/ -o results.jsonl
+    python -m src.service.bulk_scoring archive/ -o results.csv --resume -w 8
+"""
+import csv
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .scoring import score_answers
+
+SUPPORTED_EXTENSIONS = ('.json', '.jsonl')
+CSV_FIELDS = ['source', 'format', 'score', 'total_questions', 'error']
+
+
+def iter_input_files(paths: Iterable[str]) -> Iterator[str]:
+    """Yield semua file .json/.jsonl dari daftar path (direktori ditelusuri rekursif)."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
+        else:
+            raise FileNotFoundError(f"Input tidak ditemukan: {path}")
+
+
+def iter_records(paths: Iterable[str]) -> Iterator[Tuple[str, object]]:
+    """Yield (source, payload) untuk setiap kuisioner di file input.
+
+    - .jsonl: satu kuisioner per baris, source = "path:line"
+    - .json: satu kuisioner (object) atau list kuisioner, source = "path" / "path#index"
+
+    Payload JSONL dikirim sebagai string mentah supaya parsing ikut
+    dikerjakan di worker process, bukan di process utama.
+    """
+    for file_path in iter_input_files(paths):
+        if file_path.lower().endswith('.jsonl'):
+            with open(file_path, 'r', encoding='utf-8-sig') as f:
+                for line_no, line in enumerate(f, start=1):
+                    if line.strip():
+                        yield f"{file_path}:{line_no}", line
+        else:
+            with open(file_path, 'r', encoding='utf-8-sig') as f:
+                text = f.read()
+            if text.lstrip().startswith('['):
+                try:
+                    items = json.loads(text)
+                except json.JSONDecodeError:
+                    yield file_path, text
+                    continue
+                for idx, item in enumerate(items):
+                    yield f"{file_path}#{idx}", item
+            else:
+                yield file_path, text
+
+
+def score_record(record: Tuple[str, object]) -> Dict:
+    """Score satu record; dijalankan di worker process.
+
+    Payload boleh berupa dict kuisioner, string JSON, atau record arsip
+    yang menyimpan string 'questionnaire_answers' seperti form endpoint API.
+    """
+    source, payload = record
+    result = {"source": source, "format": None, "score": None, "score_details": None, "error": None}
+    try:
+        answers = json.loads(payload) if isinstance(payload, str) else payload
+        if isinstance(answers, dict) and isinstance(answers.get('questionnaire_answers'), str):
+            answers = json.loads(answers['questionnaire_answers'])
+
+        scored = score_answers(answers, include_analysis=False)
+        if scored is None:
+            result["error"] = "Format kuisioner tidak didukung (butuh field 'questions')"
+            return result
+
+        result["format"] = scored["format"]
+        result["score"] = scored["score"]
+        result["score_details"] = scored["score_details"]
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {str(e)}"
+    return result
+
+
+def truncate_partial_line(output_path: str) -> None:
+    """Buang baris terakhir yang tidak diakhiri newline (misal karena proses di-kill)."""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+
+def load_checkpoint(output_path: str) -> Set[str]:
+    """Baca source yang sudah selesai dari output sebelumnya (untuk --resume).
+
+    Output file sekaligus berfungsi sebagai checkpoint. Hanya record tanpa
+    error yang dianggap selesai; record yang gagal di-score ulang dan hasil
+    barunya di-append (baris terakhir untuk sebuah source yang berlaku).
+    Panggil truncate_partial_line dulu: baris terakhir tanpa newline bisa saja
+    ter-parse valid padahal belum lengkap.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, 'r', encoding='utf-8', newline='') as f:
+        if output_path.lower().endswith('.csv'):
+            for row in csv.DictReader(f):
+                if row.get('source') and not row.get('error'):
+                    done.add(row['source'])
+        else:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                    if not result.get("error"):
+                        done.add(result["source"])
+                except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                    continue
+    return done
+
+
+class ResultWriter:
+    """Writer incremental JSONL/CSV; setiap hasil langsung di-flush ke disk."""
+
+    def __init__(self, output_path: str, append: bool = False):
+        self.is_csv = output_path.lower().endswith('.csv')
+        needs_header = not (append and os.path.exists(output_path) and os.path.getsize(output_path) > 0)
+        self._file = open(output_path, 'a' if append else 'w', encoding='utf-8', newline='')
+        self._csv = None
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if needs_header:
+                self._csv.writeheader()
+
+    def write(self, result: Dict) -> None:
+        if self._csv is not None:
+            details = result.get("score_details") or {}
+            self._csv.writerow({
+                "source": result["source"],
+                "format": result.get("format") or '',
+                "score": '' if result.get("score") is None else result["score"],
+                "total_questions": details.get("total_questions", ''),
+                "error": result.get("error") or '',
+            })
+        else:
+            self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def run_bulk_scoring(
+    inputs: List[str],
+    output_path: str,
+    workers: Optional[int] = None,
+    resume: bool = False,
+    chunksize: int = 64,
+    progress_interval: float = 2.0,
+) -> Dict:
+    """Score semua kuisioner di inputs dan tulis hasilnya ke output_path.
+
+    Returns:
+        Dict ringkasan: processed, skipped, errors, elapsed_seconds, records_per_second
+
+    Raises:
+        FileNotFoundError: jika ada input yang tidak ada; dicek sebelum output
+            dibuka supaya hasil sebelumnya tidak ikut terhapus.
+    """
+    input_files = list(iter_input_files(inputs))
+
+    done = set()
+    if resume:
+        truncate_partial_line(output_path)
+        done = load_checkpoint(output_path)
+    if done:
+        print(f"[BULK] Resume: {len(done)} record sudah ada di {output_path}, dilewati")
+
+    stats = {"processed": 0, "skipped": 0, "errors": 0}
+
+    def pending() -> Iterator[Tuple[str, object]]:
+        for record in iter_records(input_files):
+            if record[0] in done:
+                stats["skipped"] += 1
+                continue
+            yield record
+
+    writer = ResultWriter(output_path, append=resume)
+    start = time.perf_counter()
+    last_report = start
+    try:
+        with Pool(processes=workers) as pool:
+            for result in pool.imap_unordered(score_record, pending(), chunksize=chunksize):
+                writer.write(result)
+                stats["processed"] += 1
+                if result["error"]:
+                    stats["errors"] += 1
+
+                now = time.perf_counter()
+                if now - last_report >= progress_interval:
+                    rate = stats["processed"] / (now - start)
+                    print(f"[BULK] {stats['processed']} scored | {rate:.1f} rec/s | {stats['errors']} errors")
+                    last_report = now
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats["elapsed_seconds"] = round(elapsed, 3)
+    stats["records_per_second"] = round(stats["processed"] / elapsed, 1) if elapsed > 0 else 0.0
+    print(
+        f"[BULK] Selesai: {stats['processed']} scored, {stats['skipped']} skipped, "
+        f"{stats['errors']} errors dalam {stats['elapsed_seconds']}s "
+        f"({stats['records_per_second']} rec/s) -> {output_path}"
+    )
+    return stats
+
+
+def add_arguments(parser) -> None:
+    """Daftarkan argumen bulk scoring ke argparse parser / subparser."""
+    parser.add_argument("inputs", nargs="+", help="File .json/.jsonl atau direktori berisi file tersebut")
+    parser.add_argument("-o", "--output", required=True, help="File output (.jsonl atau .csv)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Jumlah worker process (default: jumlah CPU)")
+    parser.add_argument("--resume", action="store_true", help="Lanjutkan dari output yang sudah ada; record yang sudah sukses dilewati, yang error di-score ulang")
+    parser.add_argument("--chunksize", type=int, default=64, help="Jumlah record per batch yang dikirim ke worker")
+
+
+def run_from_args(args) -> int:
+    try:
+        stats = run_bulk_scoring(
+            inputs=args.inputs,
+            output_path=args.output,
+            workers=args.workers,
+            resume=args.resume,
+            chunksize=args.chunksize,
+        )
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0 if stats["errors"] == 0 else 2
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="Offline bulk scoring kuisioner ESG / weighted (tanpa Gemini)")
+    add_arguments(parser)
+    return run_from_args(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
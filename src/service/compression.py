@@ -0,0 +1,118 @@
+"""ASGI middleware untuk kompresi response (brotli / gzip) berdasarkan Accept-Encoding.
+
+Brotli dipakai jika package `brotli` ter-install dan client mengirim `br`;
+kalau tidak, fallback ke gzip. Response di bawah minimum_size dikirim apa adanya
+karena overhead kompresi tidak sebanding untuk body kecil (misal ?fields=score).
+"""
+import gzip
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pilih "br" atau "gzip" dari header Accept-Encoding (q=0 berarti ditolak)."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+class CompressionMiddleware:
+    """Kompres body response yang >= minimum_size sesuai encoding yang diminta client.
+
+    Body di-buffer sampai selesai sebelum dikompres, jadi middleware ini ditujukan
+    untuk response JSON biasa, bukan streaming response yang panjang.
+    """
+
+    # Status tanpa body: Content-Length tidak boleh ditambahkan (RFC 9110)
+    NO_BODY_STATUSES = (204, 304)
+
+    def __init__(self, app, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        # HEAD: content-length dari app adalah panjang body GET, jangan diubah
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        body_parts = []
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if status < 200 or status in self.NO_BODY_STATUSES:
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(body_parts)
+            headers = [
+                (name, value) for name, value in start_message.get("headers", [])
+                if name.lower() != b"content-length"
+            ]
+            already_encoded = any(name.lower() == b"content-encoding" for name, _ in headers)
+            if len(body) >= self.minimum_size and not already_encoded:
+                body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                headers.append((b"vary", b"Accept-Encoding"))
+            headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
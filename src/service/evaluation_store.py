@@ -0,0 +1,316 @@
+"""Append-only history of completed evaluations with precomputed aggregates.
+
+Setiap evaluasi disimpan ke SQLite (tabel `evaluations`, tidak pernah di-update)
+dan di transaksi yang sama aggregate tables di-increment:
+
+- question_answers: distribusi jawaban per pertanyaan (hanya format ESG, jawaban A-E)
+- question_stats:   jumlah & total persentase per pertanyaan (untuk rata-rata)
+- score_histogram:  histogram skor resolusi 0.1 (untuk percentile)
+- question_risks:   frekuensi jawaban berisiko (< 50%) dan contradiction risk
+
+Semua aggregate dikelompokkan per kuartal (period, misal "2026-Q4") dan per format
+scoring (esg / weighted / freeform), jadi q1 ESG tidak tercampur dengan q1 weighted.
+Query hanya membaca tabel aggregate yang ukurannya tidak tergantung jumlah evaluasi.
+Jawaban weighted berupa free text, jadi tidak masuk question_answers (ukurannya
+akan ikut tumbuh dengan jumlah evaluasi).
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+RISK_THRESHOLD = 0.50
+HISTOGRAM_RESOLUTION = 10  # bucket per 1 poin skor -> 0.1
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+
+# Evaluasi tanpa scoring deterministik (plain text, dinilai Gemini)
+FREEFORM_FORMAT = "freeform"
+# Format dengan jawaban dari himpunan terbatas, aman untuk distribusi jawaban
+ANSWER_DISTRIBUTION_FORMATS = ("esg",)
+
+SCHEMA_VERSION = 2
+AGGREGATE_TABLES = ("question_answers", "question_stats", "score_histogram", "question_risks")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    evaluated_at TEXT NOT NULL,
+    period TEXT NOT NULL,
+    format TEXT,
+    score REAL NOT NULL,
+    score_details TEXT
+);
+CREATE TABLE IF NOT EXISTS question_answers (
+    period TEXT NOT NULL,
+    format TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, format, question_id, answer)
+);
+CREATE TABLE IF NOT EXISTS question_stats (
+    period TEXT NOT NULL,
+    format TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    sum_percentage REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, format, question_id)
+);
+CREATE TABLE IF NOT EXISTS score_histogram (
+    period TEXT NOT NULL,
+    format TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, format, bucket)
+);
+CREATE TABLE IF NOT EXISTS question_risks (
+    period TEXT NOT NULL,
+    format TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    risk_count INTEGER NOT NULL DEFAULT 0,
+    contradiction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, format, question_id)
+);
+"""
+
+
+def period_of(moment: datetime) -> str:
+    """Kuartal dari sebuah tanggal, misal datetime(2026, 10, 19) -> "2026-Q4"."""
+    return f"{moment.year}-Q{(moment.month - 1) // 3 + 1}"
+
+
+def _normalize_questions(score_details: Optional[Dict]) -> List[Dict]:
+    """Samakan question_details ESG dan weighted menjadi id/answer/percentage/contradiction."""
+    normalized = []
+    for item in (score_details or {}).get('question_details', []) or []:
+        if not isinstance(item, dict):
+            continue
+        if 'percentage' in item:
+            percentage = item.get('percentage')
+        else:
+            percentage = item.get('weight')
+        try:
+            percentage = float(percentage)
+        except (TypeError, ValueError):
+            continue
+        normalized.append({
+            'id': str(item.get('id', item.get('question_id', ''))),
+            'answer': str(item.get('answer', '')),
+            'percentage': percentage,
+            'contradiction': bool(item.get('contradiction_risk', False)),
+        })
+    return normalized
+
+
+class EvaluationStore:
+    """SQLite store untuk riwayat evaluasi dan aggregate portfolio."""
+
+    def __init__(self, db_path: str = "evaluations.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+
+    def record(self, score: float, score_details: Optional[Dict] = None,
+               evaluated_at: Optional[datetime] = None, score_format: Optional[str] = None) -> int:
+        """Simpan satu evaluasi dan update semua aggregate; return id evaluasi.
+
+        score_format berasal dari scorer ("esg" / "weighted"); None berarti
+        evaluasi freeform tanpa scoring deterministik.
+        """
+        evaluated_at = evaluated_at or datetime.utcnow()
+        period = period_of(evaluated_at)
+        score_format = score_format or FREEFORM_FORMAT
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO evaluations (evaluated_at, period, format, score, score_details) VALUES (?, ?, ?, ?, ?)",
+                (evaluated_at.isoformat(), period, score_format, float(score),
+                 json.dumps(score_details, ensure_ascii=False) if score_details is not None else None),
+            )
+            self._apply_aggregates(period, score_format, score, score_details)
+            return cursor.lastrowid
+
+    def _apply_aggregates(self, period: str, score_format: str, score: float, score_details: Optional[Dict]) -> None:
+        """Increment aggregate tables untuk satu evaluasi (dipanggil di dalam transaksi)."""
+        bucket = int(round(max(0.0, min(100.0, float(score))) * HISTOGRAM_RESOLUTION))
+        questions = _normalize_questions(score_details)
+
+        self._conn.execute(
+            "INSERT INTO score_histogram (period, format, bucket, count) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT(period, format, bucket) DO UPDATE SET count = count + 1",
+            (period, score_format, bucket),
+        )
+        if score_format in ANSWER_DISTRIBUTION_FORMATS:
+            self._conn.executemany(
+                "INSERT INTO question_answers (period, format, question_id, answer, count) VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT(period, format, question_id, answer) DO UPDATE SET count = count + 1",
+                [(period, score_format, q['id'], q['answer']) for q in questions],
+            )
+        self._conn.executemany(
+            "INSERT INTO question_stats (period, format, question_id, count, sum_percentage) VALUES (?, ?, ?, 1, ?) "
+            "ON CONFLICT(period, format, question_id) DO UPDATE SET "
+            "count = count + 1, sum_percentage = sum_percentage + excluded.sum_percentage",
+            [(period, score_format, q['id'], q['percentage']) for q in questions],
+        )
+        self._conn.executemany(
+            "INSERT INTO question_risks (period, format, question_id, risk_count, contradiction_count) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(period, format, question_id) DO UPDATE SET "
+            "risk_count = risk_count + excluded.risk_count, "
+            "contradiction_count = contradiction_count + excluded.contradiction_count",
+            [(period, score_format, q['id'], int(q['percentage'] < RISK_THRESHOLD), int(q['contradiction']))
+             for q in questions if q['percentage'] < RISK_THRESHOLD or q['contradiction']],
+        )
+
+    def _migrate(self) -> None:
+        """Buat schema; jika schema aggregate lama, bangun ulang dari tabel evaluations."""
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                for table in AGGREGATE_TABLES:
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    self._conn.execute(statement)
+            if version < SCHEMA_VERSION:
+                rows = self._conn.execute(
+                    "SELECT period, format, score, score_details FROM evaluations ORDER BY id"
+                ).fetchall()
+                for row in rows:
+                    self._apply_aggregates(
+                        row['period'], row['format'] or FREEFORM_FORMAT, row['score'],
+                        json.loads(row['score_details']) if row['score_details'] else None,
+                    )
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def get_evaluation(self, evaluation_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, evaluated_at, period, format, score, score_details FROM evaluations WHERE id = ?",
+                (evaluation_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        result = dict(row)
+        result['score_details'] = json.loads(row['score_details']) if row['score_details'] else None
+        return result
+
+    def periods(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT period FROM score_histogram ORDER BY period").fetchall()
+        return [row['period'] for row in rows]
+
+    def question_summary(self, period: Optional[str] = None, score_format: Optional[str] = None) -> List[Dict]:
+        """Rata-rata persentase dan distribusi jawaban per pertanyaan, per format."""
+        where, params = self._filter(period, score_format)
+        with self._lock:
+            stats = self._conn.execute(
+                f"SELECT format, question_id, SUM(count) AS count, SUM(sum_percentage) AS sum_percentage "
+                f"FROM question_stats {where} GROUP BY format, question_id ORDER BY format, question_id",
+                params,
+            ).fetchall()
+            answers = self._conn.execute(
+                f"SELECT format, question_id, answer, SUM(count) AS count FROM question_answers {where} "
+                f"GROUP BY format, question_id, answer ORDER BY format, question_id, answer",
+                params,
+            ).fetchall()
+
+        distribution: Dict[Tuple[str, str], Dict[str, int]] = {}
+        for row in answers:
+            distribution.setdefault((row['format'], row['question_id']), {})[row['answer']] = row['count']
+
+        return [
+            {
+                'format': row['format'],
+                'question_id': row['question_id'],
+                'count': row['count'],
+                'average_percentage': round(row['sum_percentage'] / row['count'] * 100, 2) if row['count'] else 0,
+                'answer_distribution': distribution.get((row['format'], row['question_id']), {}),
+            }
+            for row in stats
+        ]
+
+    def score_summary(self, period: Optional[str] = None, score_format: Optional[str] = None,
+                      percentiles=DEFAULT_PERCENTILES) -> Dict:
+        """Jumlah evaluasi, rata-rata, dan percentile skor (nearest-rank, resolusi 0.1)."""
+        where, params = self._filter(period, score_format)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT bucket, SUM(count) AS count FROM score_histogram {where} GROUP BY bucket ORDER BY bucket",
+                params,
+            ).fetchall()
+
+        total = sum(row['count'] for row in rows)
+        if total == 0:
+            return {'count': 0, 'average_score': None, 'min_score': None, 'max_score': None,
+                    'percentiles': {f"p{p}": None for p in percentiles}}
+
+        weighted_sum = sum(row['bucket'] * row['count'] for row in rows)
+        result_percentiles = {}
+        for p in percentiles:
+            rank = max(1, -(-p * total // 100))  # ceil(p/100 * total)
+            cumulative = 0
+            for row in rows:
+                cumulative += row['count']
+                if cumulative >= rank:
+                    result_percentiles[f"p{p}"] = row['bucket'] / HISTOGRAM_RESOLUTION
+                    break
+
+        return {
+            'count': total,
+            'average_score': round(weighted_sum / total / HISTOGRAM_RESOLUTION, 2),
+            'min_score': rows[0]['bucket'] / HISTOGRAM_RESOLUTION,
+            'max_score': rows[-1]['bucket'] / HISTOGRAM_RESOLUTION,
+            'percentiles': result_percentiles,
+        }
+
+    def risk_summary(self, period: Optional[str] = None, score_format: Optional[str] = None) -> List[Dict]:
+        """Frekuensi jawaban berisiko per pertanyaan, urut dari yang paling sering."""
+        where, params = self._filter(period, score_format)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT format, question_id, SUM(risk_count) AS risk_count, "
+                f"SUM(contradiction_count) AS contradiction_count FROM question_risks {where} "
+                f"GROUP BY format, question_id ORDER BY risk_count DESC, format, question_id",
+                params,
+            ).fetchall()
+            totals = {
+                (row['format'], row['question_id']): row['count']
+                for row in self._conn.execute(
+                    f"SELECT format, question_id, SUM(count) AS count FROM question_stats {where} "
+                    f"GROUP BY format, question_id",
+                    params,
+                ).fetchall()
+            }
+
+        return [
+            {
+                'format': row['format'],
+                'question_id': row['question_id'],
+                'risk_count': row['risk_count'],
+                'contradiction_count': row['contradiction_count'],
+                'risk_frequency': round(row['risk_count'] / totals[(row['format'], row['question_id'])], 4)
+                if totals.get((row['format'], row['question_id'])) else 0,
+            }
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _filter(period: Optional[str], score_format: Optional[str]):
+        conditions, params = [], []
+        if period:
+            conditions.append("period = ?")
+            params.append(period)
+        if score_format:
+            conditions.append("format = ?")
+            params.append(score_format)
+        return ("WHERE " + " AND ".join(conditions) if conditions else ""), tuple(params)
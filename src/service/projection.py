@@ -0,0 +1,72 @@
+"""Field projection dan summary mode untuk response QuestionnaireAnalysis.
+
+Contoh: ?fields=score,score_details.final_score_percentage hanya mengembalikan
+    {"score": 75, "score_details": {"final_score_percentage": 75.0}}
+
+Projection diterjemahkan ke spec include/exclude untuk model_dump, jadi pydantic
+hanya men-serialize bagian yang diminta dari response yang sudah divalidasi.
+"""
+from typing import Dict, List, Optional
+
+RESPONSE_FIELDS = ("analysis", "score", "evaluation_date", "score_details", "evaluation_id")
+RESPONSE_MODES = ("detail", "summary")
+
+# Bagian score_details yang dibuang di summary mode (bisa ratusan item)
+SUMMARY_EXCLUDED_DETAILS = ("question_details",)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse "a,b.c" menjadi ["a", "b.c"]; None/kosong berarti semua field.
+
+    Raises:
+        ValueError: jika field top-level tidak dikenal.
+    """
+    if not fields:
+        return None
+    paths = [path.strip() for path in fields.split(",") if path.strip()]
+    unknown = [path for path in paths if path.split(".", 1)[0] not in RESPONSE_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(RESPONSE_FIELDS)}"
+        )
+    return paths or None
+
+
+def needs_analysis(fields: Optional[List[str]], mode: str = "detail") -> bool:
+    """Apakah narasi analysis perlu dibangun untuk request ini."""
+    if mode == "summary":
+        return False
+    return fields is None or "analysis" in fields
+
+
+def build_include(fields: Optional[List[str]]) -> Optional[Dict]:
+    """Spec `include` pydantic dari field paths, misal
+    ["score", "score_details.final_score_percentage"] ->
+    {"score": True, "score_details": {"final_score_percentage": True}}
+
+    Jika parent dan child sama-sama diminta (score_details, score_details.x),
+    parent yang menang.
+    """
+    if fields is None:
+        return None
+    spec: Dict = {}
+    for path in sorted(fields, key=lambda p: p.count(".")):
+        node = spec
+        keys = path.split(".")
+        for key in keys[:-1]:
+            if node.get(key) is True:
+                break
+            node = node.setdefault(key, {})
+        else:
+            node[keys[-1]] = True
+    return spec
+
+
+def build_exclude(mode: str) -> Optional[Dict]:
+    """Spec `exclude` pydantic untuk summary mode: tanpa analysis dan detail per pertanyaan."""
+    if mode != "summary":
+        return None
+    return {
+        "analysis": True,
+        "score_details": {key: True for key in SUMMARY_EXCLUDED_DETAILS},
+    }
@@ -0,0 +1,304 @@
+"""Deterministic questionnaire scoring (ESG and weighted) without any LLM call.
+
+Dipakai oleh GeminiAnalyzer dan juga oleh bulk scoring CLI, sehingga modul ini
+sengaja tidak meng-import google.generativeai.
+"""
+from typing import Dict, Optional
+
+
+def calculate_esg_score(answers: Dict, include_analysis: bool = True) -> Optional[Dict]:
+    """
+    ESG Scoring dengan strict rules:
+    - Answer A=0%, B=25%, C=50%, D=75%, E=100%
+    - earned_points = max_points × percentage
+    - JANGAN reduce score ke 0 kecuali jawaban A atau bukti 100% kontradiksi
+    - final_score = (sum earned_points / total max_points) × 100
+
+    Input format:
+    {
+        "questions": [
+            {
+                "id": "q1",
+                "question": "Mine closure planning...",
+                "max_points": 20,
+                "answer": "D",  # A, B, C, D, or E
+                "evidence": "Optional evidence text"
+            },
+            ...
+        ]
+    }
+
+    Args:
+        include_analysis: False untuk melewati pembuatan narasi analysis
+            (analysis dikembalikan sebagai string kosong)
+
+    Returns:
+        Dict with Analysis and Score
+    """
+    try:
+        questions = answers.get('questions', [])
+
+        if not questions:
+            return None
+
+        # Answer percentage mapping
+        answer_mapping = {
+            'A': 0,
+            'B': 0.25,
+            'C': 0.50,
+            'D': 0.75,
+            'E': 1.00
+        }
+
+        question_details = []
+        total_earned_points = 0
+        total_max_points = 0
+        analysis_parts = []
+
+        strengths = []
+        risks = []
+
+        for idx, question in enumerate(questions):
+            try:
+                q_id = question.get('id', f'q{idx+1}')
+                q_text = question.get('question', '')
+                max_points = float(question.get('max_points', 100))
+                answer = str(question.get('answer', 'A')).upper()
+                evidence = question.get('evidence', '')
+
+                # Validate answer
+                if answer not in answer_mapping:
+                    print(f"[DEBUG] Invalid answer '{answer}' for {q_id}, defaulting to A")
+                    answer = 'A'
+
+                percentage = answer_mapping[answer]
+                earned_points = max_points * percentage
+
+                # Check for contradiction (strict rule: only reduce if evidence 100% contradicts)
+                final_earned_points = earned_points
+                contradiction_found = False
+
+                if evidence:
+                    contradiction_keywords = ['not implemented', 'no evidence', 'absent', 'none', 'not found', 'tidak ada']
+                    if any(keyword.lower() in evidence.lower() for keyword in contradiction_keywords):
+                        if answer not in ['A']:  # Only override if answer suggests some level
+                            print(f"[DEBUG] Potential contradiction found in {q_id}, but keeping score as evidence may be incomplete")
+                            contradiction_found = True
+
+                total_earned_points += final_earned_points
+                total_max_points += max_points
+
+                # Categorize for analysis
+                if include_analysis and percentage >= 0.75:
+                    strengths.append(f"• {q_id}: {q_text[:60]}... ({answer} - {percentage*100:.0f}%)")
+                elif include_analysis and percentage < 0.50:
+                    risk_note = " [Evidence contradiction noted]" if contradiction_found else ""
+                    risks.append(f"• {q_id}: {q_text[:60]}... ({answer} - {percentage*100:.0f}%){risk_note}")
+
+                question_details.append({
+                    'id': q_id,
+                    'answer': answer,
+                    'percentage': percentage,
+                    'max_points': max_points,
+                    'earned_points': final_earned_points,
+                    'contradiction_risk': contradiction_found
+                })
+
+            except (ValueError, TypeError) as e:
+                print(f"[DEBUG] Error parsing question {idx+1}: {str(e)}")
+                continue
+
+        # Calculate final score
+        if total_max_points > 0:
+            final_score = (total_earned_points / total_max_points) * 100
+        else:
+            final_score = 0
+
+        # Build analysis narrative
+        analysis_text = ""
+        if include_analysis:
+            analysis_text = f"""ESG SUSTAINABILITY EVALUATION - RAIMES MINING QUESTIONNAIRE
+
+SCORING METHODOLOGY:
+- Percentage values: A=0%, B=25%, C=50%, D=75%, E=100%
+- Earned points = Max points × Percentage
+- Final score = (Total earned points / Total max points) × 100
+
+ASSESSMENT SUMMARY:
+Total Questions: {len(question_details)}
+Total Points Available: {total_max_points}
+Total Points Earned: {round(total_earned_points, 2)}
+Final Score: {round(final_score, 2)}%
+
+"""
+
+            if strengths:
+                analysis_text += f"STRENGTHS (D–E Rating):\n" + "\n".join(strengths) + "\n\n"
+
+            if risks:
+                analysis_text += f"AREAS FOR IMPROVEMENT (≤C Rating):\n" + "\n".join(risks) + "\n\n"
+
+            analysis_text += """KEY FOCUS AREAS FOR MINING SUSTAINABILITY:
+• Mine Closure & Restoration Planning
+• Free Prior Informed Consent (FPIC) with Indigenous Communities
+• ESG Supplier Compliance & Chain of Custody
+• Long-term Environmental & Social Sustainability
+• Transparent Governance & Stakeholder Engagement
+"""
+
+        return {
+            "analysis": analysis_text,
+            "score": round(final_score, 2),
+            "score_details": {
+                "total_questions": len(question_details),
+                "total_max_points": total_max_points,
+                "total_earned_points": round(total_earned_points, 2),
+                "final_score_percentage": round(final_score, 2),
+                "question_details": question_details
+            }
+        }
+
+    except Exception as e:
+        print(f"[DEBUG] Error in calculate_esg_score: {str(e)}")
+        return None
+
+def calculate_weighted_score(answers: Dict) -> Optional[Dict]:
+    """
+    Hitung score berdasarkan weighted system:
+    Score setiap soal = max_score * weight_percentage
+    Total max score = 10000
+    Final score = (total_weighted_score / 10000) * 100
+
+    Struktur input yang diharapkan:
+    {
+        "questions": [
+            {
+                "id": "q1",
+                "max_score": 100,
+                "weight": 0.75,  # atau "75%" atau 75
+                "answer": "yes"
+            },
+            ...
+        ]
+    }
+
+    Returns:
+        Dict dengan detail scoring breakdown
+    """
+    try:
+        questions = answers.get('questions', [])
+
+        if not questions:
+            # Jika tidak ada struktur questions, return None
+            return None
+
+        question_scores = []
+        total_weighted_score = 0
+        total_max_possible = 0
+
+        for idx, question in enumerate(questions):
+            try:
+                # Parse max_score
+                max_score = float(question.get('max_score', 100))
+
+                # Parse weight - bisa dalam format 0.75, "75%", atau 75
+                weight_raw = question.get('weight', 1.0)
+                if isinstance(weight_raw, str):
+                    if '%' in weight_raw:
+                        weight = float(weight_raw.replace('%', '')) / 100
+                    else:
+                        weight = float(weight_raw) / 100 if float(weight_raw) > 1 else float(weight_raw)
+                else:
+                    weight = float(weight_raw) / 100 if weight_raw > 1 else float(weight_raw)
+
+                # Ensure weight is between 0 and 1
+                weight = max(0, min(1, weight))
+
+                # Hitung score untuk soal ini
+                question_score = max_score * weight
+                total_weighted_score += question_score
+                total_max_possible += max_score
+
+                question_scores.append({
+                    "question_id": question.get('id', f'q{idx+1}'),
+                    "max_score": max_score,
+                    "weight": weight,
+                    "weight_percentage": f"{weight * 100:.1f}%",
+                    "score_obtained": question_score,
+                    "answer": question.get('answer', '')
+                })
+
+            except (ValueError, TypeError) as e:
+                print(f"[DEBUG] Error parsing question {idx+1}: {str(e)}")
+                continue
+
+        # Hitung final score
+        # Total max score jika 100% adalah 10000
+        # Jadi final score = (total_weighted_score / total_max_possible) * 10000 / 100
+        if total_max_possible > 0:
+            percentage = (total_weighted_score / total_max_possible) * 100
+        else:
+            percentage = 0
+
+        final_score = int((total_weighted_score / total_max_possible * 100)) if total_max_possible > 0 else 0
+
+        return {
+            "total_questions": len(question_scores),
+            "total_weighted_score": round(total_weighted_score, 2),
+            "total_max_possible": round(total_max_possible, 2),
+            "percentage": round(percentage, 2),
+            "final_score": min(100, max(0, final_score)),  # Clamp between 0-100
+            "question_details": question_scores,
+            "scoring_method": "Weighted scoring: each question score = max_score × weight"
+        }
+
+    except Exception as e:
+        print(f"[DEBUG] Error in calculate_weighted_score: {str(e)}")
+        return None
+
+
+def detect_format(answers) -> Optional[str]:
+    """Deteksi format scoring dari jawaban kuisioner hasil json.loads.
+
+    Returns:
+        "esg" jika semua item di 'questions' punya field 'answer',
+        "weighted" untuk dict lainnya, None jika bukan dict.
+    """
+    if not isinstance(answers, dict):
+        return None
+    questions = answers.get('questions', [])
+    if questions and all(isinstance(q, dict) and 'answer' in q for q in questions):
+        return "esg"
+    return "weighted"
+
+
+def score_answers(answers: Dict, include_analysis: bool = True) -> Optional[Dict]:
+    """Pilih metode scoring sesuai format jawaban (tanpa memanggil Gemini).
+
+    Returns:
+        Dict berisi format, score, score_details (dan analysis untuk ESG),
+        atau None jika jawaban tidak bisa di-score.
+    """
+    score_format = detect_format(answers)
+    if score_format is None:
+        return None
+
+    if score_format == "esg":
+        result = calculate_esg_score(answers, include_analysis)
+        if not result:
+            return None
+        return {
+            "format": "esg",
+            "score": result["score"],
+            "score_details": result["score_details"],
+            "analysis": result["analysis"],
+        }
+
+    details = calculate_weighted_score(answers)
+    if not details:
+        return None
+    return {
+        "format": "weighted",
+        "score": details["final_score"],
+        "score_details": details,
+    }
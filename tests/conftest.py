@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def evaluation_db_path(tmp_path_factory):
+    """Arahkan evaluation store ke tmp supaya test tidak membuat evaluations.db di cwd."""
+    path = tmp_path_factory.mktemp("evaluations") / "evaluations.db"
+    previous = os.environ.get("EVALUATION_DB_PATH")
+    os.environ["EVALUATION_DB_PATH"] = str(path)
+    yield path
+    if previous is None:
+        os.environ.pop("EVALUATION_DB_PATH", None)
+    else:
+        os.environ["EVALUATION_DB_PATH"] = previous
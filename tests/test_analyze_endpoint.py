@@ -0,0 +1,97 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import src.main as main
+from src.service.evaluation_store import EvaluationStore, period_of
+from src.service.scoring import calculate_esg_score
+
+client = TestClient(main.app)
+
+
+def _questionnaire(*answers):
+    return json.dumps({
+        "questions": [
+            {"id": f"q{i+1}", "question": f"Question {i+1}", "max_points": 10, "answer": answer}
+            for i, answer in enumerate(answers)
+        ]
+    })
+
+
+def _use_offline_scoring(monkeypatch):
+    async def analyze(questionnaire_answers, supporting_file_content=None,
+                      supporting_file_name=None, include_analysis=True):
+        result = calculate_esg_score(json.loads(questionnaire_answers), include_analysis)
+        return {**result, "score_format": "esg"}
+
+    monkeypatch.setattr(main, "analyze_mining_questionnaire", analyze)
+
+
+def test_summary_mode_drops_analysis_and_question_details(monkeypatch):
+    _use_offline_scoring(monkeypatch)
+    resp = client.post(
+        "/analyze-mining-questionnaire",
+        params={"mode": "summary"},
+        data={"questionnaire_answers": _questionnaire("D", "D")},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert "analysis" not in data
+    assert "question_details" not in data["score_details"]
+    assert data["score"] == 75
+    assert isinstance(data["evaluation_id"], int)
+
+
+def test_fields_projection_uses_validated_response(monkeypatch):
+    _use_offline_scoring(monkeypatch)
+    resp = client.post(
+        "/analyze-mining-questionnaire",
+        params={"fields": "score,score_details.final_score_percentage"},
+        data={"questionnaire_answers": _questionnaire("D")},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"score": 75, "score_details": {"final_score_percentage": 75.0}}
+
+    # projection tidak boleh melewati validasi QuestionnaireAnalysis (score >= 1)
+    resp = client.post(
+        "/analyze-mining-questionnaire",
+        params={"fields": "score"},
+        data={"questionnaire_answers": _questionnaire("A")},
+    )
+    assert resp.status_code == 500
+
+
+def test_evaluation_endpoints_read_back_posted_evaluation(monkeypatch, tmp_path):
+    _use_offline_scoring(monkeypatch)
+    monkeypatch.setattr(main, "_evaluation_store", EvaluationStore(str(tmp_path / "evaluations.db")))
+
+    resp = client.post(
+        "/analyze-mining-questionnaire",
+        data={"questionnaire_answers": _questionnaire("E", "B", "E", "E", "E")},
+    )
+    assert resp.status_code == 200
+    posted = resp.json()
+    period = period_of(main.datetime.fromisoformat(posted["evaluation_date"]))
+
+    stored = client.get(f"/evaluations/{posted['evaluation_id']}").json()
+    assert stored["format"] == "esg"
+    assert stored["score"] == posted["score"] == 85
+    assert stored["score_details"] == posted["score_details"]
+
+    # /evaluations/periods harus dideklarasikan sebelum /evaluations/{evaluation_id}
+    assert client.get("/evaluations/periods").json() == {"periods": [period]}
+
+    questions = client.get("/evaluations/aggregates/questions", params={"period": period, "format": "esg"}).json()
+    assert [(q["question_id"], q["answer_distribution"]) for q in questions["questions"]] == [
+        ("q1", {"E": 1}), ("q2", {"B": 1}), ("q3", {"E": 1}), ("q4", {"E": 1}), ("q5", {"E": 1}),
+    ]
+
+    scores = client.get("/evaluations/aggregates/scores", params={"period": period}).json()
+    assert scores["count"] == 1
+    assert scores["percentiles"]["p50"] == 85.0
+
+    risks = client.get("/evaluations/aggregates/risks", params={"format": "esg"}).json()
+    assert [(r["question_id"], r["risk_frequency"]) for r in risks["risks"]] == [("q2", 1.0)]
+    assert client.get("/evaluations/aggregates/risks", params={"format": "weighted"}).json()["risks"] == []
+
+    assert client.get(f"/evaluations/{posted['evaluation_id'] + 1}").status_code == 404
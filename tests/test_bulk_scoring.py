@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from src.service.bulk_scoring import load_checkpoint, run_bulk_scoring
+
+
+ESG_QUESTIONNAIRE = {
+    "questions": [
+        {"id": "q1", "question": "Mine closure planning", "max_points": 20, "answer": "D"},
+        {"id": "q2", "question": "FPIC with indigenous communities", "max_points": 20, "answer": "B"},
+    ]
+}
+
+
+def test_bulk_scoring_jsonl_and_resume(tmp_path):
+    archive = tmp_path / "archive"
+    archive.mkdir()
+    (archive / "site_a.json").write_text(json.dumps(ESG_QUESTIONNAIRE))
+    (archive / "batch.jsonl").write_text(
+        json.dumps(ESG_QUESTIONNAIRE) + "\n" + json.dumps({"raw_text": "no questions"}) + "\n"
+    )
+    output = tmp_path / "results.jsonl"
+
+    stats = run_bulk_scoring([str(archive)], str(output), workers=2, chunksize=1)
+    assert stats["processed"] == 3
+    assert stats["errors"] == 1
+
+    results = {r["source"]: r for r in map(json.loads, output.read_text().splitlines())}
+    site_a = results[str(archive / "site_a.json")]
+    assert site_a["format"] == "esg"
+    assert site_a["score"] == 50.0
+    assert site_a["score_details"]["total_questions"] == 2
+
+    # resume: record sukses dilewati, record yang error di-score ulang (dan tetap error)
+    stats = run_bulk_scoring([str(archive)], str(output), workers=2, resume=True)
+    assert stats["processed"] == 1
+    assert stats["skipped"] == 2
+    assert stats["errors"] == 1
+    assert len(load_checkpoint(str(output))) == 2
+
+
+def test_bulk_scoring_csv_output(tmp_path):
+    source = tmp_path / "batch.jsonl"
+    source.write_text(json.dumps({"questionnaire_answers": json.dumps(ESG_QUESTIONNAIRE)}) + "\n")
+    output = tmp_path / "results.csv"
+
+    run_bulk_scoring([str(source)], str(output), workers=1)
+
+    lines = output.read_text().splitlines()
+    assert lines[0] == "source,format,score,total_questions,error"
+    assert lines[1] == f"{source}:1,esg,50.0,2,"
+
+
+def test_resume_rescores_partial_last_line(tmp_path):
+    source = tmp_path / "batch.jsonl"
+    source.write_text("".join(json.dumps(ESG_QUESTIONNAIRE) + "\n" for _ in range(5)))
+
+    for name in ("results.jsonl", "results.csv"):
+        output = tmp_path / name
+        run_bulk_scoring([str(source)], str(output), workers=1)
+        complete = output.read_bytes()
+
+        # proses di-kill di tengah penulisan baris terakhir: hanya newline yang hilang,
+        # sisa baris masih ter-parse valid tapi tidak boleh dianggap selesai
+        output.write_bytes(complete.rstrip(b"\r\n"))
+        stats = run_bulk_scoring([str(source)], str(output), workers=1, resume=True)
+
+        assert stats["skipped"] == 4
+        assert stats["processed"] == 1
+        assert len(load_checkpoint(str(output))) == 5
+        assert output.read_bytes().count(b"\n") == complete.count(b"\n")
+
+
+def test_missing_input_keeps_existing_output(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"source": "x"}\n')
+
+    with pytest.raises(FileNotFoundError):
+        run_bulk_scoring([str(tmp_path / "nope")], str(output), workers=1)
+    assert output.read_text() == '{"source": "x"}\n'
+
+
+def test_resume_retries_failed_records_csv(tmp_path):
+    source = tmp_path / "batch.jsonl"
+    source.write_text(json.dumps(ESG_QUESTIONNAIRE) + "\n" + "{not json\n")
+    output = tmp_path / "results.csv"
+
+    assert run_bulk_scoring([str(source)], str(output), workers=1)["errors"] == 1
+    assert load_checkpoint(str(output)) == {f"{source}:1"}
+
+    # record yang gagal sudah diperbaiki di arsip -> resume men-score ulang
+    source.write_text(json.dumps(ESG_QUESTIONNAIRE) + "\n" + json.dumps(ESG_QUESTIONNAIRE) + "\n")
+    stats = run_bulk_scoring([str(source)], str(output), workers=1, resume=True)
+    assert (stats["skipped"], stats["processed"], stats["errors"]) == (1, 1, 0)
+    assert load_checkpoint(str(output)) == {f"{source}:1", f"{source}:2"}
@@ -0,0 +1,99 @@
+import json
+import sqlite3
+from datetime import datetime
+
+from src.service.evaluation_store import EvaluationStore, period_of
+from src.service.scoring import calculate_esg_score, calculate_weighted_score
+
+
+def _esg_details(*answers):
+    questions = [
+        {"id": f"q{i+1}", "question": f"Question {i+1}", "max_points": 10, "answer": answer}
+        for i, answer in enumerate(answers)
+    ]
+    return calculate_esg_score({"questions": questions})
+
+
+def test_record_and_aggregates(tmp_path):
+    store = EvaluationStore(str(tmp_path / "evaluations.db"))
+    q4 = datetime(2026, 10, 19)
+    q3 = datetime(2026, 8, 1)
+
+    for answers, moment in [(("E", "A"), q4), (("C", "A"), q4), (("E", "E"), q3)]:
+        result = _esg_details(*answers)
+        store.record(result["score"], result["score_details"], evaluated_at=moment, score_format="esg")
+
+    assert period_of(q4) == "2026-Q4"
+    assert store.periods() == ["2026-Q3", "2026-Q4"]
+
+    questions = {q["question_id"]: q for q in store.question_summary("2026-Q4")}
+    assert questions["q1"]["count"] == 2
+    assert questions["q1"]["average_percentage"] == 75.0
+    assert questions["q1"]["answer_distribution"] == {"C": 1, "E": 1}
+
+    scores = store.score_summary()
+    assert scores["count"] == 3
+    assert scores["min_score"] == 25.0
+    assert scores["max_score"] == 100.0
+    assert scores["percentiles"]["p50"] == 50.0
+
+    risks = {r["question_id"]: r for r in store.risk_summary()}
+    assert risks["q2"]["risk_count"] == 2
+    assert risks["q2"]["risk_frequency"] == round(2 / 3, 4)
+    assert "q1" not in risks
+
+
+def test_get_evaluation_roundtrip(tmp_path):
+    store = EvaluationStore(str(tmp_path / "evaluations.db"))
+    result = _esg_details("D")
+    evaluation_id = store.record(result["score"], result["score_details"], score_format="esg")
+
+    stored = store.get_evaluation(evaluation_id)
+    assert stored["format"] == "esg"
+    assert stored["score"] == 75.0
+    assert stored["score_details"] == result["score_details"]
+    assert store.get_evaluation(evaluation_id + 1) is None
+
+
+def test_formats_are_aggregated_separately(tmp_path):
+    store = EvaluationStore(str(tmp_path / "evaluations.db"))
+    esg = _esg_details("E")
+    store.record(esg["score"], esg["score_details"], score_format="esg")
+    for answer in ("free text one", "free text two"):
+        weighted = calculate_weighted_score({"questions": [{"max_score": 100, "weight": 0.2, "answer": answer}]})
+        store.record(weighted["final_score"], weighted, score_format="weighted")
+
+    questions = {(q["format"], q["question_id"]): q for q in store.question_summary()}
+    assert questions[("esg", "q1")]["average_percentage"] == 100.0
+    assert questions[("weighted", "q1")]["average_percentage"] == 20.0
+    assert questions[("weighted", "q1")]["count"] == 2
+    # jawaban weighted free text tidak disimpan sebagai distribusi
+    assert questions[("weighted", "q1")]["answer_distribution"] == {}
+
+    assert store.score_summary(score_format="esg")["count"] == 1
+    assert store.score_summary(score_format="weighted")["count"] == 2
+    assert [r["format"] for r in store.risk_summary(score_format="weighted")] == ["weighted"]
+
+
+def test_old_schema_is_rebuilt_from_evaluations(tmp_path):
+    db_path = tmp_path / "evaluations.db"
+    result = _esg_details("B")
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE evaluations (id INTEGER PRIMARY KEY AUTOINCREMENT, evaluated_at TEXT NOT NULL,
+            period TEXT NOT NULL, format TEXT, score REAL NOT NULL, score_details TEXT);
+        CREATE TABLE question_stats (period TEXT NOT NULL, question_id TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0, sum_percentage REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, question_id));
+    """)
+    conn.execute(
+        "INSERT INTO evaluations (evaluated_at, period, format, score, score_details) VALUES (?, ?, ?, ?, ?)",
+        ("2026-10-19T00:00:00", "2026-Q4", "esg", result["score"], json.dumps(result["score_details"])),
+    )
+    conn.commit()
+    conn.close()
+
+    store = EvaluationStore(str(db_path))
+    assert store.score_summary()["count"] == 1
+    assert store.question_summary()[0]["answer_distribution"] == {"B": 1}
+    assert store.risk_summary()[0]["risk_count"] == 1
@@ -0,0 +1,138 @@
+import asyncio
+import gzip
+import types
+
+import pytest
+
+from src.service import compression
+from src.service.projection import build_exclude, build_include, needs_analysis, parse_fields
+
+
+def test_parse_fields_and_needs_analysis():
+    fields = parse_fields(" score , score_details.final_score_percentage,")
+    assert fields == ["score", "score_details.final_score_percentage"]
+    assert parse_fields(None) is None
+    assert not needs_analysis(fields)
+    assert needs_analysis(None)
+    assert not needs_analysis(None, mode="summary")
+    with pytest.raises(ValueError):
+        parse_fields("score,unknown")
+
+
+def test_build_include_nested_paths():
+    assert build_include(None) is None
+    assert build_include(["score", "score_details.final_score_percentage"]) == {
+        "score": True,
+        "score_details": {"final_score_percentage": True},
+    }
+    # parent path wins over child path, in either order
+    assert build_include(["score_details.total_questions", "score_details"]) == {"score_details": True}
+    assert build_include(["score_details", "score_details.total_questions"]) == {"score_details": True}
+
+
+def test_build_exclude_for_summary():
+    assert build_exclude("detail") is None
+    assert build_exclude("summary") == {
+        "analysis": True,
+        "score_details": {"question_details": True},
+    }
+
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression.negotiate_encoding("gzip, deflate, br") == "gzip"
+    assert compression.negotiate_encoding("gzip;q=0, identity") is None
+    assert compression.negotiate_encoding("*") == "gzip"
+
+    body = b'{"score": 75.0}' * 100
+    assert gzip.decompress(compression.compress(body, "gzip")) == body
+
+
+def _run_asgi(app, accept_encoding=None, method="GET"):
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app({"type": "http", "method": method, "path": "/", "headers": headers}, receive, send))
+    return sent
+
+
+def _chunked_app(body, extra_headers=(), chunk_size=1000):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers + list(extra_headers)})
+        for start in range(0, len(body), chunk_size):
+            chunk = body[start:start + chunk_size]
+            await send({"type": "http.response.body", "body": chunk, "more_body": start + chunk_size < len(body)})
+    return app
+
+
+def _headers(message):
+    return {name.decode(): value.decode() for name, value in message["headers"]}
+
+
+def test_middleware_gzips_chunked_body(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    body = b"x" * 3000
+    sent = _run_asgi(compression.CompressionMiddleware(_chunked_app(body)), "gzip, deflate")
+
+    assert len(sent) == 2
+    headers = _headers(sent[0])
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["content-length"] == str(len(sent[1]["body"]))
+    assert gzip.decompress(sent[1]["body"]) == body
+
+
+def test_middleware_passes_through_small_or_encoded_bodies(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+    sent = _run_asgi(compression.CompressionMiddleware(_chunked_app(b"x" * 500)), "gzip")
+    assert "content-encoding" not in _headers(sent[0])
+    assert sent[1]["body"] == b"x" * 500
+
+    encoded = _chunked_app(b"y" * 3000, extra_headers=[(b"content-encoding", b"identity")])
+    sent = _run_asgi(compression.CompressionMiddleware(encoded), "gzip")
+    assert _headers(sent[0])["content-encoding"] == "identity"
+    assert sent[1]["body"] == b"y" * 3000
+
+    sent = _run_asgi(compression.CompressionMiddleware(_chunked_app(b"z" * 3000)))
+    assert "content-encoding" not in _headers(sent[0])
+
+
+def test_middleware_selects_br_by_q_value(monkeypatch):
+    fake_brotli = types.SimpleNamespace(compress=lambda body, quality: b"BR" + body[:10])
+    monkeypatch.setattr(compression, "brotli", fake_brotli)
+    assert compression.negotiate_encoding("gzip;q=0.5, br;q=0.9") == "br"
+    assert compression.negotiate_encoding("br;q=0.1, gzip") == "gzip"
+
+    sent = _run_asgi(compression.CompressionMiddleware(_chunked_app(b"x" * 3000)), "gzip, br")
+    assert _headers(sent[0])["content-encoding"] == "br"
+    assert sent[1]["body"] == b"BR" + b"x" * 10
+
+
+def test_middleware_leaves_head_and_no_body_statuses_untouched(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+    async def head_app(scope, receive, send):
+        headers = [(b"content-type", b"application/json"), (b"content-length", b"5000")]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = _run_asgi(compression.CompressionMiddleware(head_app), "gzip", method="HEAD")
+    assert _headers(sent[0]) == {"content-type": "application/json", "content-length": "5000"}
+    assert sent[1]["body"] == b""
+
+    for status in (204, 304):
+        async def no_body_app(scope, receive, send, status=status):
+            await send({"type": "http.response.start", "status": status, "headers": [(b"etag", b'"abc"')]})
+            await send({"type": "http.response.body", "body": b""})
+
+        sent = _run_asgi(compression.CompressionMiddleware(no_body_app), "gzip")
+        assert sent[0]["status"] == status
+        assert _headers(sent[0]) == {"etag": '"abc"'}